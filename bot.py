@@ -1,8 +1,9 @@
 import os
 import json
+import random
 import logging
 import asyncio
-from pathlib import Path
+import sqlite3
 from telegram import Update, Bot
 from telegram.ext import (
     Application,
@@ -11,61 +12,232 @@ from telegram.ext import (
     ContextTypes,
     filters,
 )
-from telegram.error import TelegramError
+from telegram.request import HTTPXRequest
+from telegram.error import BadRequest, NetworkError, RetryAfter, TelegramError, TimedOut
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
 
 # Configure logging
 logging.basicConfig(
     format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
     level=logging.INFO
 )
+# httpx logs every Bot API request at INFO
+logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
-# File to store channels
+# Database storing channels, and the legacy JSON file imported into it once
+CHANNELS_DB = "channels.db"
 CHANNELS_FILE = "channels.json"
 
 # Admin user IDs (add your Telegram user ID here)
-ADMIN_IDS = list(map(int, os.getenv("ADMIN_IDS", "").split(","))) if os.getenv("ADMIN_IDS") else []
+ADMIN_IDS = frozenset(int(x) for x in os.getenv("ADMIN_IDS", "").split(",") if x.strip())
 
+# Maximum number of in-flight sends during a broadcast
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "25"))
+SEM = asyncio.Semaphore(BROADCAST_CONCURRENCY)
 
-def load_channels() -> dict:
-    """Load channels from JSON file."""
-    if Path(CHANNELS_FILE).exists():
-        try:
-            with open(CHANNELS_FILE, "r") as f:
-                return json.load(f)
-        except (json.JSONDecodeError, IOError):
-            return {"channels": []}
-    return {"channels": []}
+# Attempts per channel before a send counts as failed
+SEND_ATTEMPTS = 5
 
+# Optional Redis used to share flood-control waits between workers
+REDIS_URL = os.getenv("REDIS_URL")
+# Seconds to wait on Redis before treating it as unavailable for that call
+REDIS_TIMEOUT = 1.0
+# Redis client; None until first use, False once found unconfigured or invalid
+_redis = None
 
-def save_channels(data: dict) -> None:
-    """Save channels to JSON file."""
-    with open(CHANNELS_FILE, "w") as f:
-        json.dump(data, f, indent=2)
+# Only plain messages reach our handlers; edits are not re-broadcast
+ALLOWED_UPDATES = [Update.MESSAGE]
 
+# /list is split into messages of at most this many characters
+# (Telegram rejects anything over 4096)
+LIST_CHUNK_LIMIT = 3800
 
-def is_admin(user_id: int) -> bool:
-    """Check if user is an admin."""
-    return user_id in ADMIN_IDS
+# Payload sent by /test
+TEST_MESSAGE = {
+    "text": "🧪 *Test Message*\nThis is a test broadcast from the bot.",
+    "parse_mode": "Markdown"
+}
 
 
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
-    """Handle /start command."""
-    user = update.effective_user
+# SQLite connection, opened lazily by _db()
+_conn = None
+
+# Channel writes waiting to be flushed, and the task that will flush them
+WRITE_DELAY = 0.5
+_pending_ops = []
+_pending_write = None
+
+# Loaded channels plus id/username indices, reused until another connection writes
+_CACHE = {"version": None, "data": None, "by_id": {}, "by_username": {}}
+
+
+def _store_cache(data: dict, version) -> None:
+    """Remember data for version and rebuild the lookup indices."""
+    _CACHE["data"] = data
+    _CACHE["version"] = version
+    _CACHE["by_id"] = {c["id"]: c for c in data["channels"]}
+    _CACHE["by_username"] = {c["username"]: c for c in data["channels"] if c.get("username")}
+
+
+def _loads(raw: bytes) -> dict:
+    """Parse channels data, preferring orjson when installed."""
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+
+def _import_json(conn: sqlite3.Connection) -> None:
+    """One-shot import of channels from the legacy JSON file."""
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= 1:
+        return
     
-    if not is_admin(user.id):
-        await update.message.reply_text(
-            "⛔ You are not authorized to use this bot.\n"
-            f"Your User ID: `{user.id}`",
-            parse_mode="Markdown"
+    try:
+        with open(CHANNELS_FILE, "rb") as f:
+            channels = _loads(f.read()).get("channels", [])
+    except FileNotFoundError:
+        channels = []
+    except (ValueError, IOError) as e:
+        logger.warning("Could not import %s: %s", CHANNELS_FILE, e)
+        channels = []
+    
+    conn.executemany(
+        "INSERT OR IGNORE INTO channels (id, title, username) VALUES (?, ?, ?)",
+        [(c["id"], c.get("title"), c.get("username")) for c in channels]
+    )
+    conn.execute("PRAGMA user_version = 1")
+    if channels:
+        logger.info("Imported %d channels from %s", len(channels), CHANNELS_FILE)
+
+
+def _db() -> sqlite3.Connection:
+    """Return the channels database connection, creating it on first use."""
+    global _conn
+    if _conn is None:
+        _conn = sqlite3.connect(CHANNELS_DB, isolation_level=None)
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _conn.execute("PRAGMA synchronous=NORMAL")
+        # seq keeps channels in the order they were added
+        _conn.execute(
+            "CREATE TABLE IF NOT EXISTS channels ("
+            "seq INTEGER PRIMARY KEY AUTOINCREMENT, "
+            "id INTEGER UNIQUE NOT NULL, title TEXT, username TEXT)"
         )
+        _import_json(_conn)
+    return _conn
+
+
+def load_channels() -> dict:
+    """Load channels from the database, reusing the cached copy if unchanged."""
+    conn = _db()
+    version = conn.execute("PRAGMA data_version").fetchone()[0]
+    
+    if version == _CACHE["version"]:
+        return _CACHE["data"]
+    
+    rows = conn.execute("SELECT id, title, username FROM channels ORDER BY seq").fetchall()
+    data = {"channels": [{"id": r[0], "title": r[1], "username": r[2]} for r in rows]}
+    
+    _store_cache(data, version)
+    return data
+
+
+def find_channel(channel_input: str):
+    """Look up a loaded channel by id or @username."""
+    try:
+        channel = _CACHE["by_id"].get(int(channel_input))
+    except ValueError:
+        channel = None
+    return channel or _CACHE["by_username"].get(channel_input.lstrip("@"))
+
+
+def _flush_writes() -> None:
+    """Apply all queued channel writes in a single transaction."""
+    if not _pending_ops:
         return
+    ops = _pending_ops[:]
+    _pending_ops.clear()
     
-    welcome_text = f"""
-👋 *Welcome to Multi-Channel Broadcaster Bot!*
+    conn = _db()
+    try:
+        conn.execute("BEGIN")
+        for sql, params in ops:
+            conn.execute(sql, params)
+        conn.execute("COMMIT")
+    except sqlite3.Error:
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        # The cache already shows these changes; put them back in front of any
+        # newer writes so the next flush (or shutdown) retries them in order
+        _pending_ops[:0] = ops
+        logger.exception("Failed to write %d channel changes; will retry", len(ops))
+
+
+async def _delayed_flush() -> None:
+    """Wait for further writes to coalesce, then flush them."""
+    await asyncio.sleep(WRITE_DELAY)
+    _flush_writes()
+
+
+def _queue_write(sql: str, params: tuple) -> None:
+    """Queue a channel write; writes within WRITE_DELAY share one flush."""
+    global _pending_write
+    _pending_ops.append((sql, params))
+    if _pending_write is None or _pending_write.done():
+        _pending_write = asyncio.create_task(_delayed_flush())
+
+
+async def flush_pending_writes() -> None:
+    """Flush queued writes immediately, e.g. on shutdown."""
+    if _pending_write is not None and not _pending_write.done():
+        _pending_write.cancel()
+    _flush_writes()
+
+
+def insert_channel(channel: dict) -> None:
+    """Add a channel to the cache and queue it for the database."""
+    data = load_channels()
+    data["channels"].append(channel)
+    _CACHE["by_id"][channel["id"]] = channel
+    if channel.get("username"):
+        _CACHE["by_username"][channel["username"]] = channel
+    _queue_write(
+        "INSERT OR IGNORE INTO channels (id, title, username) VALUES (?, ?, ?)",
+        (channel["id"], channel["title"], channel["username"])
+    )
+
+
+def delete_channel(channel: dict) -> None:
+    """Drop a channel from the cache and queue its deletion."""
+    data = load_channels()
+    data["channels"].remove(channel)
+    _CACHE["by_id"].pop(channel["id"], None)
+    if channel.get("username"):
+        _CACHE["by_username"].pop(channel["username"], None)
+    _queue_write("DELETE FROM channels WHERE id = ?", (channel["id"],))
+
 
-*Your User ID:* `{user.id}`
+def is_admin(user_id: int) -> bool:
+    """Check if user is an admin."""
+    return user_id in ADMIN_IDS
 
+
+# Static reply texts, built once at import
+_WELCOME_HEAD = """
+👋 *Welcome to Multi-Channel Broadcaster Bot!*
+
+*Your User ID:* `{uid}`
+"""
+_WELCOME_TAIL = """
 *Available Commands:*
 • `/add <channel_id>` - Add a channel
 • `/remove <channel_id>` - Remove a channel
@@ -80,7 +252,24 @@ async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
 
 *Note:* Channel IDs usually start with `-100`
 """
-    await update.message.reply_text(welcome_text, parse_mode="Markdown")
+
+
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
+    """Handle /start command."""
+    user = update.effective_user
+    
+    if not is_admin(user.id):
+        await update.message.reply_text(
+            "⛔ You are not authorized to use this bot.\n"
+            f"Your User ID: `{user.id}`",
+            parse_mode="Markdown"
+        )
+        return
+    
+    await update.message.reply_text(
+        _WELCOME_HEAD.format(uid=user.id) + _WELCOME_TAIL,
+        parse_mode="Markdown"
+    )
 
 
 async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
@@ -90,12 +279,6 @@ async def help_command(update: Update, context: ContextTypes.DEFAULT_TYPE) -> No
 
 async def add_channel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Add a channel to the broadcast list."""
-    user = update.effective_user
-    
-    if not is_admin(user.id):
-        await update.message.reply_text("⛔ Unauthorized access.")
-        return
-    
     if not context.args:
         await update.message.reply_text(
             "❌ Please provide a channel ID or username.\n"
@@ -108,8 +291,11 @@ async def add_channel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
     
     # Try to get channel info to verify bot is admin
     try:
-        chat = await context.bot.get_chat(channel_id)
-        member = await context.bot.get_chat_member(chat.id, context.bot.id)
+        # Both calls accept the raw @username or -100 id, so run them together
+        chat, member = await asyncio.gather(
+            context.bot.get_chat(channel_id),
+            context.bot.get_chat_member(channel_id, context.bot.id)
+        )
         
         if member.status not in ["administrator", "creator"]:
             await update.message.reply_text(
@@ -127,16 +313,15 @@ async def add_channel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
         }
         
         # Check if already exists
-        existing_ids = [c["id"] for c in data["channels"]]
-        if chat.id in existing_ids:
+        if chat.id in _CACHE["by_id"]:
             await update.message.reply_text(
                 f"ℹ️ Channel *{chat.title}* is already in the list.",
                 parse_mode="Markdown"
             )
             return
         
-        data["channels"].append(channel_info)
-        save_channels(data)
+        insert_channel(channel_info)
+        context.bot_data["channels"] = data["channels"]
         
         await update.message.reply_text(
             f"✅ Successfully added *{chat.title}*\n"
@@ -157,12 +342,6 @@ async def add_channel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> Non
 
 async def remove_channel(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Remove a channel from the broadcast list."""
-    user = update.effective_user
-    
-    if not is_admin(user.id):
-        await update.message.reply_text("⛔ Unauthorized access.")
-        return
-    
     if not context.args:
         await update.message.reply_text(
             "❌ Please provide a channel ID.\n"
@@ -175,15 +354,11 @@ async def remove_channel(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     data = load_channels()
     
     # Find and remove channel
-    removed = None
-    for i, channel in enumerate(data["channels"]):
-        if (str(channel["id"]) == channel_input or 
-            channel.get("username") == channel_input.lstrip("@")):
-            removed = data["channels"].pop(i)
-            break
+    removed = find_channel(channel_input)
     
     if removed:
-        save_channels(data)
+        delete_channel(removed)
+        context.bot_data["channels"] = data["channels"]
         await update.message.reply_text(
             f"✅ Removed *{removed['title']}* from broadcast list.\n"
             f"Remaining channels: {len(data['channels'])}",
@@ -199,12 +374,6 @@ async def remove_channel(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
 
 async def list_channels(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """List all channels in the broadcast list."""
-    user = update.effective_user
-    
-    if not is_admin(user.id):
-        await update.message.reply_text("⛔ Unauthorized access.")
-        return
-    
     data = load_channels()
     
     if not data["channels"]:
@@ -215,27 +384,105 @@ async def list_channels(update: Update, context: ContextTypes.DEFAULT_TYPE) -> N
         )
         return
     
-    channels_text = "*📢 Broadcast Channels:*\n\n"
-    for i, channel in enumerate(data["channels"], 1):
-        username = f"@{channel['username']}" if channel.get('username') else "No username"
-        channels_text += f"{i}. *{channel['title']}*\n   ID: `{channel['id']}`\n   Username: {username}\n\n"
-    
-    channels_text += f"*Total:* {len(data['channels'])} channels"
+    lines = [
+        f"{i}. *{c['title']}*\n   ID: `{c['id']}`\n   Username: "
+        f"{'@' + c['username'] if c.get('username') else 'No username'}"
+        for i, c in enumerate(data["channels"], 1)
+    ]
+    
+    lines.insert(0, "*📢 Broadcast Channels:*")
+    lines.append(f"*Total:* {len(data['channels'])} channels")
+    
+    # Pack whole entries into each message by length, not a fixed count,
+    # so long titles/usernames can't push a page past the limit
+    pages = []
+    page = []
+    size = 0
+    for line in lines:
+        if page and size + len(line) + 2 > LIST_CHUNK_LIMIT:
+            pages.append("\n\n".join(page))
+            page, size = [], 0
+        page.append(line)
+        size += len(line) + 2
+    pages.append("\n\n".join(page))
+    
+    for channels_text in pages:
+        await update.message.reply_text(channels_text, parse_mode="Markdown")
+
+
+def _get_redis():
+    """Return the shared Redis client, or None if not configured or unusable."""
+    global _redis
+    if _redis is None:
+        _redis = False
+        if REDIS_URL and aioredis is not None:
+            try:
+                _redis = aioredis.from_url(
+                    REDIS_URL,
+                    socket_connect_timeout=REDIS_TIMEOUT,
+                    socket_timeout=REDIS_TIMEOUT,
+                )
+            except Exception as e:
+                logger.warning("Invalid REDIS_URL, shared backoff disabled: %s", e)
+    return _redis if _redis is not False else None
+
+
+async def _wait_shared_backoff(chat_id) -> None:
+    """Sleep out a flood-control wait another worker recorded for chat_id."""
+    redis = _get_redis()
+    if redis is None:
+        return
+    try:
+        ttl = await redis.ttl(f"telegram:retry:{chat_id}")
+    except Exception as e:
+        logger.warning("Redis backoff lookup failed: %s", e)
+        return
+    if ttl > 0:
+        await asyncio.sleep(ttl)
+
+
+async def _set_shared_backoff(chat_id, seconds: int) -> None:
+    """Record a flood-control wait for chat_id so other workers honor it."""
+    redis = _get_redis()
+    if redis is None:
+        return
+    try:
+        await redis.setex(f"telegram:retry:{chat_id}", seconds, "1")
+    except Exception as e:
+        logger.warning("Redis backoff update failed: %s", e)
+
+
+async def _with_retry(send, **kwargs) -> None:
+    """Await send(**kwargs), holding a broadcast semaphore slot only while sending.
     
-    await update.message.reply_text(channels_text, parse_mode="Markdown")
+    Flood-control (RetryAfter) and transient network errors are retried
+    with jittered backoff; anything else is raised immediately. Waits
+    happen outside the semaphore so other channels keep sending.
+    """
+    for attempt in range(SEND_ATTEMPTS):
+        await _wait_shared_backoff(kwargs["chat_id"])
+        try:
+            async with SEM:
+                await send(**kwargs)
+            return
+        except BadRequest:
+            raise
+        except RetryAfter as e:
+            await _set_shared_backoff(kwargs["chat_id"], e.retry_after)
+            if attempt == SEND_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(e.retry_after * random.uniform(1.0, 1.3))
+        except (TimedOut, NetworkError):
+            if attempt == SEND_ATTEMPTS - 1:
+                raise
+            await asyncio.sleep(min(2 ** attempt, 30) * random.uniform(0.8, 1.2))
 
 
 async def test_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Send a test message to all channels."""
-    user = update.effective_user
+    channels = context.bot_data["channels"]
     
-    if not is_admin(user.id):
-        await update.message.reply_text("⛔ Unauthorized access.")
-        return
-    
-    data = load_channels()
-    
-    if not data["channels"]:
+    if not channels:
         await update.message.reply_text("❌ No channels to test. Add channels first.")
         return
     
@@ -245,38 +492,98 @@ async def test_broadcast(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
     
     status_msg = await update.message.reply_text("🔄 Testing broadcast...")
     
-    for channel in data["channels"]:
-        try:
-            await context.bot.send_message(
-                chat_id=channel["id"],
-                text="🧪 *Test Message*\nThis is a test broadcast from the bot.",
-                parse_mode="Markdown"
-            )
+    results = await asyncio.gather(
+        *(_send_to(channel, context.bot.send_message, TEST_MESSAGE) for channel in channels)
+    )
+    
+    for channel, error in results:
+        if error is None:
             success += 1
-        except TelegramError as e:
+        else:
             failed += 1
-            failed_channels.append(f"{channel['title']}: {str(e)}")
+            failed_channels.append((channel["title"], str(error)))
     
     result_text = f"*Test Broadcast Results:*\n\n✅ Success: {success}\n❌ Failed: {failed}"
     
     if failed_channels:
-        result_text += "\n\n*Failed channels:*\n" + "\n".join(failed_channels)
+        result_text += "\n\n*Failed channels:*\n" + "\n".join(f"{t}: {e}" for t, e in failed_channels)
     
     await status_msg.edit_text(result_text, parse_mode="Markdown")
 
 
+def _prepare_send(message, bot: Bot) -> tuple:
+    """Pick the send method and arguments for message once per broadcast.
+    
+    Returns (send, kwargs); the caller only has to add chat_id.
+    """
+    # Copy the message based on content type
+    if message.photo:
+        return bot.send_photo, {
+            "photo": message.photo[-1].file_id,
+            "caption": message.caption,
+            "caption_entities": message.caption_entities
+        }
+    if message.video:
+        return bot.send_video, {
+            "video": message.video.file_id,
+            "caption": message.caption,
+            "caption_entities": message.caption_entities
+        }
+    if message.document:
+        return bot.send_document, {
+            "document": message.document.file_id,
+            "caption": message.caption,
+            "caption_entities": message.caption_entities
+        }
+    if message.audio:
+        return bot.send_audio, {
+            "audio": message.audio.file_id,
+            "caption": message.caption,
+            "caption_entities": message.caption_entities
+        }
+    if message.voice:
+        return bot.send_voice, {
+            "voice": message.voice.file_id,
+            "caption": message.caption
+        }
+    if message.video_note:
+        return bot.send_video_note, {"video_note": message.video_note.file_id}
+    if message.sticker:
+        return bot.send_sticker, {"sticker": message.sticker.file_id}
+    if message.animation:
+        return bot.send_animation, {
+            "animation": message.animation.file_id,
+            "caption": message.caption,
+            "caption_entities": message.caption_entities
+        }
+    if message.text:
+        return bot.send_message, {
+            "text": message.text,
+            "entities": message.entities
+        }
+    # For other types, try to forward
+    return message.forward, {}
+
+
+async def _send_to(channel: dict, send, kwargs: dict) -> tuple:
+    """Send a prepared message to a single channel.
+    
+    Returns (channel, None) on success or (channel, error) on failure.
+    """
+    try:
+        await _with_retry(send, chat_id=channel["id"], **kwargs)
+    except TelegramError as e:
+        return channel, e
+    return channel, None
+
+
 async def broadcast_media(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     """Broadcast media to all channels."""
-    user = update.effective_user
     message = update.message
     
-    if not is_admin(user.id):
-        await message.reply_text("⛔ Unauthorized access.")
-        return
-    
-    data = load_channels()
+    channels = context.bot_data["channels"]
     
-    if not data["channels"]:
+    if not channels:
         await message.reply_text(
             "❌ No channels configured.\n"
             "Use `/add <channel_id>` to add channels first.",
@@ -285,89 +592,33 @@ async def broadcast_media(update: Update, context: ContextTypes.DEFAULT_TYPE) ->
         return
     
     status_msg = await message.reply_text(
-        f"📤 Broadcasting to {len(data['channels'])} channels..."
+        f"📤 Broadcasting to {len(channels)} channels..."
+    )
+    
+    send, kwargs = _prepare_send(message, context.bot)
+    results = await asyncio.gather(
+        *(_send_to(channel, send, kwargs) for channel in channels)
     )
     
     success = 0
     failed = 0
     failed_channels = []
     
-    for channel in data["channels"]:
-        try:
-            # Forward or copy the message based on content type
-            if message.photo:
-                await context.bot.send_photo(
-                    chat_id=channel["id"],
-                    photo=message.photo[-1].file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities
-                )
-            elif message.video:
-                await context.bot.send_video(
-                    chat_id=channel["id"],
-                    video=message.video.file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities
-                )
-            elif message.document:
-                await context.bot.send_document(
-                    chat_id=channel["id"],
-                    document=message.document.file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities
-                )
-            elif message.audio:
-                await context.bot.send_audio(
-                    chat_id=channel["id"],
-                    audio=message.audio.file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities
-                )
-            elif message.voice:
-                await context.bot.send_voice(
-                    chat_id=channel["id"],
-                    voice=message.voice.file_id,
-                    caption=message.caption
-                )
-            elif message.video_note:
-                await context.bot.send_video_note(
-                    chat_id=channel["id"],
-                    video_note=message.video_note.file_id
-                )
-            elif message.sticker:
-                await context.bot.send_sticker(
-                    chat_id=channel["id"],
-                    sticker=message.sticker.file_id
-                )
-            elif message.animation:
-                await context.bot.send_animation(
-                    chat_id=channel["id"],
-                    animation=message.animation.file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities
-                )
-            elif message.text:
-                await context.bot.send_message(
-                    chat_id=channel["id"],
-                    text=message.text,
-                    entities=message.entities
-                )
-            else:
-                # For other types, try to forward
-                await message.forward(chat_id=channel["id"])
-            
+    for channel, error in results:
+        if error is None:
             success += 1
-            
-        except TelegramError as e:
+        else:
             failed += 1
-            failed_channels.append(f"• {channel['title']}: {str(e)}")
-            logger.error(f"Failed to send to {channel['title']}: {e}")
+            failed_channels.append((channel["title"], str(error)))
+            logger.error("Failed to send to %s: %s", channel["title"], error)
     
     # Update status
-    result_text = f"*Broadcast Complete!*\n\n✅ Sent: {success}/{len(data['channels'])}"
+    result_text = f"*Broadcast Complete!*\n\n✅ Sent: {success}/{len(channels)}"
     
     if failed > 0:
-        result_text += f"\n❌ Failed: {failed}\n\n*Errors:*\n" + "\n".join(failed_channels[:5])
+        result_text += f"\n❌ Failed: {failed}\n\n*Errors:*\n" + "\n".join(
+            f"• {t}: {e}" for t, e in failed_channels[:5]
+        )
         if len(failed_channels) > 5:
             result_text += f"\n...and {len(failed_channels) - 5} more"
     
@@ -383,6 +634,16 @@ async def get_my_id(update: Update, context: ContextTypes.DEFAULT_TYPE) -> None:
     )
 
 
+async def _post_init(application: Application) -> None:
+    """Load channels once so broadcasts never touch the database."""
+    application.bot_data["channels"] = load_channels()["channels"]
+
+
+async def _post_shutdown(application: Application) -> None:
+    """Make sure no queued channel writes are lost on exit."""
+    await flush_pending_writes()
+
+
 def main() -> None:
     """Start the bot."""
     # Get bot token from environment variable
@@ -395,24 +656,43 @@ def main() -> None:
     if not ADMIN_IDS:
         logger.warning("ADMIN_IDS not set. Bot will reject all users!")
     
-    # Create application
-    application = Application.builder().token(token).build()
+    # Create application with a connection pool large enough for concurrent broadcasts
+    request = HTTPXRequest(
+        connection_pool_size=BROADCAST_CONCURRENCY + 8,
+        pool_timeout=20.0,
+        connect_timeout=5.0,
+        read_timeout=20.0
+    )
+    application = (
+        Application.builder()
+        .token(token)
+        .request(request)
+        .get_updates_request(HTTPXRequest(connection_pool_size=1))
+        .post_init(_post_init)
+        .post_shutdown(_post_shutdown)
+        .build()
+    )
     
     # Add handlers
+    # Non-admin updates are dropped by admin_filter before reaching the handlers;
+    # /start, /help and /myid stay open so users can look up their ID
+    admin_filter = filters.User(user_id=list(ADMIN_IDS))
     application.add_handler(CommandHandler("start", start))
     application.add_handler(CommandHandler("help", help_command))
-    application.add_handler(CommandHandler("add", add_channel))
-    application.add_handler(CommandHandler("remove", remove_channel))
-    application.add_handler(CommandHandler("list", list_channels))
-    application.add_handler(CommandHandler("test", test_broadcast))
+    application.add_handler(CommandHandler("add", add_channel, filters=admin_filter))
+    application.add_handler(CommandHandler("remove", remove_channel, filters=admin_filter))
+    application.add_handler(CommandHandler("list", list_channels, filters=admin_filter))
+    application.add_handler(CommandHandler("test", test_broadcast, filters=admin_filter))
     application.add_handler(CommandHandler("myid", get_my_id))
     
     # Handle all media and text messages for broadcasting
     application.add_handler(MessageHandler(
-        filters.PHOTO | filters.VIDEO | filters.AUDIO | 
-        filters.Document.ALL | filters.VOICE | filters.VIDEO_NOTE |
-        filters.Sticker.ALL | filters.ANIMATION | 
-        (filters.TEXT & ~filters.COMMAND),
+        admin_filter & (
+            filters.PHOTO | filters.VIDEO | filters.AUDIO | 
+            filters.Document.ALL | filters.VOICE | filters.VIDEO_NOTE |
+            filters.Sticker.ALL | filters.ANIMATION | 
+            (filters.TEXT & ~filters.COMMAND)
+        ),
         broadcast_media
     ))
     
@@ -429,11 +709,12 @@ def main() -> None:
             listen="0.0.0.0",
             port=port,
             secret_token=os.getenv("WEBHOOK_SECRET", "your-secret-token"),
-            webhook_url=webhook_url
+            webhook_url=webhook_url,
+            allowed_updates=ALLOWED_UPDATES
         )
     else:
         # Development: Use polling
-        application.run_polling(allowed_updates=Update.ALL_TYPES)
+        application.run_polling(allowed_updates=ALLOWED_UPDATES)
 
 
 if __name__ == "__main__":
@@ -1,16 +1,27 @@
 import os
+import functools
+from dataclasses import dataclass
 from dotenv import load_dotenv
 
-load_dotenv()
 
+@dataclass(slots=True, frozen=True)
 class Config:
     # Bot configuration
-    BOT_TOKEN = os.getenv('BOT_TOKEN')
-    OWNER_ID = int(os.getenv('OWNER_ID', 0))
+    BOT_TOKEN: str | None
+    OWNER_ID: int
     
     # Webhook configuration (for Render)
-    WEBHOOK_URL = os.getenv('WEBHOOK_URL', '')
-    PORT = int(os.getenv('PORT', 10000))
-    
-    # Store channels in memory (simple list)
-    channels = []
\ No newline at end of file
+    WEBHOOK_URL: str
+    PORT: int
+
+
+@functools.lru_cache(maxsize=1)
+def get_config() -> Config:
+    """Read configuration from the environment (and .env) once"""
+    load_dotenv()
+    return Config(
+        BOT_TOKEN=os.getenv('BOT_TOKEN'),
+        OWNER_ID=int(os.getenv('OWNER_ID', 0)),
+        WEBHOOK_URL=os.getenv('WEBHOOK_URL', ''),
+        PORT=int(os.getenv('PORT', 10000)),
+    )
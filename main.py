@@ -1,13 +1,24 @@
 
 
+import asyncio
+import atexit
+import json
 import logging
-import threading
+import os
+import queue
+import signal
 import time
-import requests
+from collections import Counter
+from dataclasses import asdict, dataclass
+from functools import partial
+from logging.handlers import QueueHandler, QueueListener
+import aiofiles
+import httpx
 import uvicorn
 from fastapi import FastAPI
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import (
+    AIORateLimiter,
     Application,
     CommandHandler,
     CallbackQueryHandler,
@@ -16,15 +27,34 @@ from telegram.ext import (
     ContextTypes,
 )
 from telegram.constants import ParseMode
-from config import Config
+from telegram.error import BadRequest, Forbidden, NetworkError
+from telegram.request import HTTPXRequest
+from config import get_config
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
 
 # ─────────────────────────────
 #  LOGGING
 # ─────────────────────────────
-logging.basicConfig(
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    level=logging.INFO
-)
+# Records go through a queue; a background thread does the actual stream I/O
+# so bursts of broadcast failures don't block the event loop
+_log_queue = queue.SimpleQueue()
+_log_stream = logging.StreamHandler()
+_log_stream.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+_log_listener = QueueListener(_log_queue, _log_stream)
+_log_listener.start()
+atexit.register(_log_listener.stop)
+
+# No formatter on the QueueHandler: it would pre-format records that the
+# stream handler then formats a second time
+_root_logger = logging.getLogger()
+_root_logger.addHandler(QueueHandler(_log_queue))
+_root_logger.setLevel(logging.INFO)
+# httpx logs every request at INFO: each getUpdates poll and each broadcast send
+logging.getLogger("httpx").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
 # ─────────────────────────────
@@ -44,9 +74,8 @@ def ping():
 def stats():
     return {
         "status": "ok",
-        "channels_count": len(Config.channels),
-        "channels": Config.channels,
-        "owner_id": Config.OWNER_ID,
+        "channels_count": len(CHANNELS),
+        "owner_id": OWNER_ID,
         "uptime": time.time() - START_TIME
     }
 
@@ -54,54 +83,101 @@ def stats():
 #  GLOBAL VARIABLES
 # ─────────────────────────────
 START_TIME = time.time()
+CONFIG = get_config()
+
+# Config values bound once at import; handlers read these module globals
+BOT_TOKEN = CONFIG.BOT_TOKEN
+OWNER_ID = CONFIG.OWNER_ID
+WEBHOOK_URL = CONFIG.WEBHOOK_URL
+PORT = CONFIG.PORT
+
+# Fail at import rather than run with OWNER_ID=0, which no real user has
+if not OWNER_ID:
+    logger.error("❌ Missing OWNER_ID environment variable")
+    raise RuntimeError("OWNER_ID is required")
+
+# Only the owner may use the bot; other users are dropped by this filter
+OWNER_FILTER = filters.User(user_id=OWNER_ID)
+
+# Update types our handlers consume; Telegram filters out the rest server-side
+ALLOWED_UPDATES = [Update.MESSAGE, Update.CALLBACK_QUERY]
+
+# Seconds Telegram holds each getUpdates open when idle (PTB defaults to 10)
+POLL_TIMEOUT = 30
+
+# Max in-flight sends per broadcast (Telegram allows ~30 msg/s overall)
+BROADCAST_CONCURRENCY = 25
+
+# Tries per channel on transient network errors, sleeping 0.5s, 2s, ... between them
+SEND_ATTEMPTS = 3
+SEND_BACKOFF = 0.5
+
+# Broadcasts to fewer channels than this get only a final summary, no progress message
+BROADCAST_PROGRESS_MIN = 5
+
+# Bot admin status per chat id as (timestamp, status), reused for ADMIN_CACHE_TTL seconds
+ADMIN_STATUSES = ('administrator', 'creator')
+ADMIN_CACHE_TTL = 300
+_admin_cache = {}
+
+# get_chat results per @username or id as (timestamp, chat), reused for CHAT_CACHE_TTL seconds
+CHAT_CACHE_TTL = 3600
+_chat_cache = {}
+
+@dataclass(slots=True)
+class Channel:
+    """A registered broadcast target"""
+    id: int
+    username: str | None
+    title: str
+    added_by: int
+    added_time: float
+
+# Store channels in memory, keyed by chat id (insertion-ordered)
+CHANNELS = {}
+
+# CHANNELS is saved here, shortly after each change
+CHANNELS_FILE = "channels.json"
+SAVE_DELAY = 0.5
+_pending_save = None
+# _channels_version that the file on disk reflects
+_saved_version = 0
+
+# Bumped on every CHANNELS change; rendered lists are cached per version
+_channels_version = 0
+_list_cache = {}
+
+# Channel list messages are split below Telegram's 4096-character limit
+LIST_CHUNK_LIMIT = 3800
+_remove_kb_cache = (-1, None)
+
+# Long-running loops (keep-alive, health monitor) started in post_init
+_background_tasks = []
 
 # ─────────────────────────────
-#  TELEGRAM COMMAND HANDLERS
+#  MESSAGE TEMPLATES
 # ─────────────────────────────
-async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Start command handler"""
-    if update.effective_user.id != Config.OWNER_ID:
-        await update.message.reply_text("⚠️ Unauthorized. Only owner can use this bot.")
-        return
-    
-    keyboard = [
-        [InlineKeyboardButton("📢 Add Channel", callback_data="add_channel")],
-        [InlineKeyboardButton("📋 List Channels", callback_data="list_channels")],
-        [InlineKeyboardButton("🗑️ Remove Channel", callback_data="remove_channel")],
-        [InlineKeyboardButton("🔄 Clear All", callback_data="clear_all")],
-        [InlineKeyboardButton("📊 Statistics", callback_data="stats_cmd")]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
-    await update.message.reply_text(
-        "🤖 *Channel Manager Bot*\n\n"
-        "📌 *Features:*\n"
-        "• Add bot as admin to channels\n"
-        "• Forward messages to all channels\n"
-        "• Manage multiple channels easily\n\n"
-        "📌 *How to use:*\n"
-        "1. Add bot as admin to your channels\n"
-        "2. Use /addchannel to register channels\n"
-        "3. Send any media/message to forward\n\n"
-        "📌 *Commands:*\n"
-        "/start - Show this menu\n"
-        "/addchannel - Add a channel\n"
-        "/listchannels - List all channels\n"
-        "/removechannel - Remove a channel\n"
-        "/clearchannels - Clear all channels\n"
-        "/stats - Show statistics\n"
-        "/help - Show help",
-        reply_markup=reply_markup,
-        parse_mode=ParseMode.MARKDOWN
-    )
+_WELCOME_TEXT = (
+    "🤖 *Channel Manager Bot*\n\n"
+    "📌 *Features:*\n"
+    "• Add bot as admin to channels\n"
+    "• Forward messages to all channels\n"
+    "• Manage multiple channels easily\n\n"
+    "📌 *How to use:*\n"
+    "1. Add bot as admin to your channels\n"
+    "2. Use /addchannel to register channels\n"
+    "3. Send any media/message to forward\n\n"
+    "📌 *Commands:*\n"
+    "/start - Show this menu\n"
+    "/addchannel - Add a channel\n"
+    "/listchannels - List all channels\n"
+    "/removechannel - Remove a channel\n"
+    "/clearchannels - Clear all channels\n"
+    "/stats - Show statistics\n"
+    "/help - Show help"
+)
 
-async def help_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Help command handler"""
-    if update.effective_user.id != Config.OWNER_ID:
-        await update.message.reply_text("⚠️ Unauthorized. Only owner can use this bot.")
-        return
-    
-    help_text = """
+_HELP_TEXT = """
 📚 *Channel Manager Bot - Help Guide*
 
 *1. Setup:*
@@ -125,19 +201,257 @@ async def help_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 - `/stats` - View statistics
 
 *5. Notes:*
-- Channels stored in memory
-- Reset on bot restart
+- Channels saved to channels.json
+- Kept across bot restarts
 - Only you (owner) can use bot
     """
+
+_STATS_TEMPLATE = """
+📊 *Bot Statistics*
+
+🤖 *Bot Info:*
+• Username: @{username}
+• Owner ID: `{owner}`
+• Uptime: {uptime}
+
+📢 *Channels:*
+• Total: {n} channels
+
+🔄 *System:*
+• Status: Running
+• Mode: Polling
+• Storage: channels.json
+• Restart: Channels kept
+
+🔗 *Webhook URL:*
+{webhook}
+    """
+
+_STATS_BRIEF_TEMPLATE = """
+📊 *Bot Statistics*
+
+🤖 *Bot Info:*
+• Username: @{username}
+• Owner ID: `{owner}`
+• Uptime: {uptime}
+
+📢 *Channels:*
+• Total: {n} channels
+
+🔄 *System:*
+• Status: Active
+• Mode: Polling
+• Storage: channels.json
+        """
+
+_CLEAR_CONFIRM_TEMPLATE = (
+    "⚠️ *Confirm Clear All Channels*\n\n"
+    "This will remove *{n}* channels.\n"
+    "*This action cannot be undone!*"
+)
+
+# Keyboards never change, so build the markup objects once
+_START_KEYBOARD = InlineKeyboardMarkup([
+    [InlineKeyboardButton("📢 Add Channel", callback_data="add_channel")],
+    [InlineKeyboardButton("📋 List Channels", callback_data="list_channels")],
+    [InlineKeyboardButton("🗑️ Remove Channel", callback_data="remove_channel")],
+    [InlineKeyboardButton("🔄 Clear All", callback_data="clear_all")],
+    [InlineKeyboardButton("📊 Statistics", callback_data="stats_cmd")]
+])
+
+_CLEAR_CONFIRM_KEYBOARD = InlineKeyboardMarkup([
+    [
+        InlineKeyboardButton("✅ Yes, clear all", callback_data="clear_yes"),
+        InlineKeyboardButton("❌ No, cancel", callback_data="clear_no")
+    ]
+])
+
+# ─────────────────────────────
+#  CHANNEL STORAGE
+# ─────────────────────────────
+def _channels_changed():
+    """Invalidate everything rendered from CHANNELS and schedule a save"""
+    global _channels_version, _pending_save
+    _channels_version += 1
+    if _pending_save is None or _pending_save.done():
+        _pending_save = asyncio.create_task(_delayed_save())
+
+async def _save_channels():
+    """Write CHANNELS to disk via a temp file and atomic rename"""
+    global _saved_version
+    version = _channels_version
+    tmp_file = CHANNELS_FILE + ".tmp"
+    payload = json.dumps({"channels": [asdict(c) for c in CHANNELS.values()]}, indent=2)
+    async with aiofiles.open(tmp_file, "w") as f:
+        await f.write(payload)
+    os.replace(tmp_file, CHANNELS_FILE)
+    _saved_version = version
+
+async def _delayed_save():
+    """Let a burst of changes coalesce, then save until the file is current"""
+    # Changes made while a write is in flight don't schedule a new task
+    # (this one isn't done yet), so keep saving until nothing has moved
+    while True:
+        await asyncio.sleep(SAVE_DELAY)
+        try:
+            await _save_channels()
+        except OSError as e:
+            logger.error("Failed to save channels: %s", e)
+            return
+        if _saved_version == _channels_version:
+            return
+
+def _load_channels():
+    """Read saved channels into CHANNELS"""
+    try:
+        with open(CHANNELS_FILE, "r") as f:
+            saved = json.load(f).get("channels", [])
+    except FileNotFoundError:
+        return
+    except (json.JSONDecodeError, OSError) as e:
+        logger.error("Failed to load channels: %s", e)
+        return
     
-    await update.message.reply_text(help_text, parse_mode=ParseMode.MARKDOWN)
+    for record in saved:
+        # Tolerate records written by bot.py ({id, title, username}) or with
+        # extra keys; skip only ones that can't name a chat
+        try:
+            channel = Channel(
+                id=int(record['id']),
+                username=record.get('username'),
+                title=record.get('title') or str(record['id']),
+                added_by=record.get('added_by', OWNER_ID),
+                added_time=record.get('added_time', 0.0)
+            )
+        except (KeyError, TypeError, ValueError, AttributeError) as e:
+            logger.warning("Skipping unreadable channel record %r: %s", record, e)
+            continue
+        CHANNELS[channel.id] = channel
+    logger.info("📂 Loaded %d channels from %s", len(CHANNELS), CHANNELS_FILE)
+
+async def post_init(application: Application):
+    """Restore saved channels and start background tasks before polling begins"""
+    _load_channels()
+    
+    # Keep-alive and health checks share the bot's event loop
+    if WEBHOOK_URL:
+        _background_tasks.append(asyncio.create_task(keep_alive()))
+        logger.info("✅ Keep-alive system started")
+    else:
+        logger.info("ℹ️ Keep-alive system disabled (no WEBHOOK_URL)")
+    _background_tasks.append(asyncio.create_task(bot_health_monitor(application.bot)))
+    logger.info("✅ Health monitor started")
+
+async def post_shutdown(application: Application):
+    """Stop background tasks and flush a pending save so no change is lost on exit"""
+    for task in _background_tasks:
+        task.cancel()
+    await asyncio.gather(*_background_tasks, return_exceptions=True)
+    _background_tasks.clear()
+    
+    if _pending_save is not None and not _pending_save.done():
+        _pending_save.cancel()
+        await asyncio.gather(_pending_save, return_exceptions=True)
+    if _saved_version != _channels_version:
+        await _save_channels()
+
+# ─────────────────────────────
+#  TELEGRAM COMMAND HANDLERS
+# ─────────────────────────────
+async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Start command handler"""
+    await update.message.reply_text(
+        _WELCOME_TEXT,
+        reply_markup=_START_KEYBOARD,
+        parse_mode=ParseMode.MARKDOWN
+    )
+
+async def help_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
+    """Help command handler"""
+    await update.message.reply_text(_HELP_TEXT, parse_mode=ParseMode.MARKDOWN)
+
+def _render_channel_list(with_username):
+    """Build the registered-channels messages (each under LIST_CHUNK_LIMIT), reusing them until CHANNELS changes"""
+    cached = _list_cache.get(with_username)
+    if cached and cached[0] == _channels_version:
+        return cached[1]
+    
+    chunks = []
+    parts = ["📋 *Registered Channels:*\n\n"]
+    size = len(parts[0])
+    for i, channel in enumerate(CHANNELS.values(), 1):
+        entry = f"{i}. *{channel.title}*\n   • ID: `{channel.id}`\n"
+        if with_username:
+            entry += f"   • Username: @{channel.username or 'N/A'}\n"
+        entry += "\n"
+        # Start a new message before this one would pass Telegram's 4096 limit
+        if size + len(entry) > LIST_CHUNK_LIMIT:
+            chunks.append("".join(parts))
+            parts, size = [], 0
+        parts.append(entry)
+        size += len(entry)
+    parts.append(f"📊 *Total:* {len(CHANNELS)} channels")
+    chunks.append("".join(parts))
+    
+    messages = tuple(chunks)
+    _list_cache[with_username] = (_channels_version, messages)
+    return messages
+
+def _remove_keyboard():
+    """Build the one-button-per-channel removal keyboard, reusing it until CHANNELS changes"""
+    global _remove_kb_cache
+    if _remove_kb_cache[0] == _channels_version:
+        return _remove_kb_cache[1]
+    
+    reply_markup = InlineKeyboardMarkup([
+        [InlineKeyboardButton(f"❌ {channel.title[:30]}", callback_data=f"remove_{channel.id}")]
+        for channel in CHANNELS.values()
+    ])
+    _remove_kb_cache = (_channels_version, reply_markup)
+    return reply_markup
+
+def _find_known_channel(channel_identifier):
+    """Return the registered channel matching an @username or id, if any"""
+    if channel_identifier.startswith('@'):
+        username = channel_identifier[1:]
+        return next((c for c in CHANNELS.values() if c.username == username), None)
+    try:
+        return CHANNELS.get(int(channel_identifier))
+    except ValueError:
+        return None
+
+async def _cached_chat(bot, chat_ref):
+    """Return get_chat(chat_ref), reusing a recent result for the same reference"""
+    cached = _chat_cache.get(chat_ref)
+    if cached and time.monotonic() - cached[0] < CHAT_CACHE_TTL:
+        return cached[1]
+    
+    chat = await bot.get_chat(chat_ref)
+    _chat_cache[chat_ref] = (time.monotonic(), chat)
+    return chat
+
+def _forget_chat(chat_id):
+    """Drop cached chat info and admin status for chat_id under every reference it was looked up by"""
+    refs = {chat_id}
+    refs.update(ref for ref, (_, chat) in _chat_cache.items() if chat.id == chat_id)
+    for ref in refs:
+        _chat_cache.pop(ref, None)
+        _admin_cache.pop(ref, None)
+
+async def _cached_admin_status(bot, chat_id):
+    """Return the bot's member status in chat_id (id or @username), caching admin results"""
+    cached = _admin_cache.get(chat_id)
+    if cached and time.monotonic() - cached[0] < ADMIN_CACHE_TTL:
+        return cached[1]
+    
+    chat_member = await bot.get_chat_member(chat_id, bot.id)
+    # Only cache positive results so a freshly promoted bot isn't refused
+    if chat_member.status in ADMIN_STATUSES:
+        _admin_cache[chat_id] = (time.monotonic(), chat_member.status)
+    return chat_member.status
 
 async def addchannel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Add a channel to the bot"""
-    if update.effective_user.id != Config.OWNER_ID:
-        await update.message.reply_text("⚠️ Unauthorized. Only owner can use this bot.")
-        return
-    
     args = context.args
     
     if not args:
@@ -152,17 +466,26 @@ async def addchannel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     
     channel_identifier = args[0]
     
+    # Already registered channels need no API round-trip
+    known = _find_known_channel(channel_identifier)
+    if known:
+        await update.message.reply_text(
+            f"⚠️ *Channel already registered:*\n`{known.title}`",
+            parse_mode=ParseMode.MARKDOWN
+        )
+        return
+    
     try:
-        # Get channel info
-        if channel_identifier.startswith('@'):
-            chat = await context.bot.get_chat(channel_identifier)
-        else:
-            chat = await context.bot.get_chat(int(channel_identifier))
+        chat_ref = channel_identifier if channel_identifier.startswith('@') else int(channel_identifier)
         
-        # Check if bot is admin
-        chat_member = await context.bot.get_chat_member(chat.id, context.bot.id)
+        # Get channel info and check bot admin status concurrently; both
+        # calls accept either the @username or the numeric id
+        chat, status = await asyncio.gather(
+            _cached_chat(context.bot, chat_ref),
+            _cached_admin_status(context.bot, chat_ref)
+        )
         
-        if chat_member.status not in ['administrator', 'creator']:
+        if status not in ADMIN_STATUSES:
             await update.message.reply_text(
                 f"❌ *Bot is not admin in* `{chat.title}`\n"
                 "Please add bot as administrator first with all permissions.",
@@ -171,34 +494,34 @@ async def addchannel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
             return
         
         # Check if already exists
-        for channel in Config.channels:
-            if channel['id'] == chat.id:
-                await update.message.reply_text(
-                    f"⚠️ *Channel already registered:*\n`{chat.title}`",
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                return
+        if chat.id in CHANNELS:
+            await update.message.reply_text(
+                f"⚠️ *Channel already registered:*\n`{chat.title}`",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
         
         # Add channel
-        Config.channels.append({
-            'id': chat.id,
-            'username': chat.username,
-            'title': chat.title,
-            'added_by': update.effective_user.id,
-            'added_time': time.time()
-        })
+        CHANNELS[chat.id] = Channel(
+            id=chat.id,
+            username=chat.username,
+            title=chat.title,
+            added_by=update.effective_user.id,
+            added_time=time.time()
+        )
+        _channels_changed()
         
         await update.message.reply_text(
             f"✅ *Channel Added Successfully!*\n\n"
             f"📛 *Title:* {chat.title}\n"
             f"🆔 *ID:* `{chat.id}`\n"
             f"👤 *Username:* @{chat.username or 'N/A'}\n"
-            f"📊 *Total Channels:* {len(Config.channels)}",
+            f"📊 *Total Channels:* {len(CHANNELS)}",
             parse_mode=ParseMode.MARKDOWN
         )
         
     except Exception as e:
-        logger.error(f"Error adding channel: {e}")
+        logger.error("Error adding channel: %s", e)
         await update.message.reply_text(
             f"❌ *Error adding channel:*\n`{str(e)}`\n\n"
             "*Make sure:*\n"
@@ -210,62 +533,44 @@ async def addchannel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def listchannels_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """List all registered channels"""
-    if update.effective_user.id != Config.OWNER_ID:
-        await update.message.reply_text("⚠️ Unauthorized. Only owner can use this bot.")
-        return
-    
-    if not Config.channels:
+    if not CHANNELS:
         await update.message.reply_text("📭 *No channels registered yet.*", parse_mode=ParseMode.MARKDOWN)
         return
     
-    message = "📋 *Registered Channels:*\n\n"
-    for i, channel in enumerate(Config.channels, 1):
-        message += f"{i}. *{channel['title']}*\n"
-        message += f"   • ID: `{channel['id']}`\n"
-        message += f"   • Username: @{channel['username'] or 'N/A'}\n\n"
-    
-    message += f"📊 *Total:* {len(Config.channels)} channels"
-    await update.message.reply_text(message, parse_mode=ParseMode.MARKDOWN)
+    for message in _render_channel_list(with_username=True):
+        await update.message.reply_text(
+            message,
+            parse_mode=ParseMode.MARKDOWN,
+            disable_web_page_preview=True
+        )
 
 async def removechannel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Remove a channel"""
-    if update.effective_user.id != Config.OWNER_ID:
-        await update.message.reply_text("⚠️ Unauthorized. Only owner can use this bot.")
-        return
-    
-    if not Config.channels:
+    if not CHANNELS:
         await update.message.reply_text("📭 *No channels to remove.*", parse_mode=ParseMode.MARKDOWN)
         return
     
     args = context.args
     
     if not args:
-        # Create inline keyboard with channels
-        keyboard = []
-        for channel in Config.channels:
-            button_text = f"❌ {channel['title'][:30]}"
-            callback_data = f"remove_{channel['id']}"
-            keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
         await update.message.reply_text(
             "🗑️ *Select a channel to remove:*",
-            reply_markup=reply_markup,
+            reply_markup=_remove_keyboard(),
             parse_mode=ParseMode.MARKDOWN
         )
         return
     
     try:
         channel_id = int(args[0])
-        for i, channel in enumerate(Config.channels):
-            if channel['id'] == channel_id:
-                removed = Config.channels.pop(i)
-                await update.message.reply_text(
-                    f"✅ *Channel Removed:*\n`{removed['title']}`\n"
-                    f"📊 *Remaining:* {len(Config.channels)} channels",
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                return
+        removed = CHANNELS.pop(channel_id, None)
+        if removed:
+            _channels_changed()
+            await update.message.reply_text(
+                f"✅ *Channel Removed:*\n`{removed.title}`\n"
+                f"📊 *Remaining:* {len(CHANNELS)} channels",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
         
         await update.message.reply_text("❌ *Channel not found.*", parse_mode=ParseMode.MARKDOWN)
     
@@ -274,177 +579,146 @@ async def removechannel_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
 async def clearchannels_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Clear all channels"""
-    if update.effective_user.id != Config.OWNER_ID:
-        await update.message.reply_text("⚠️ Unauthorized. Only owner can use this bot.")
-        return
-    
-    if not Config.channels:
+    if not CHANNELS:
         await update.message.reply_text("📭 *No channels to clear.*", parse_mode=ParseMode.MARKDOWN)
         return
     
-    # Confirmation buttons
-    keyboard = [
-        [
-            InlineKeyboardButton("✅ Yes, clear all", callback_data="clear_yes"),
-            InlineKeyboardButton("❌ No, cancel", callback_data="clear_no")
-        ]
-    ]
-    reply_markup = InlineKeyboardMarkup(keyboard)
-    
     await update.message.reply_text(
-        f"⚠️ *Confirm Clear All Channels*\n\n"
-        f"This will remove *{len(Config.channels)}* channels.\n"
-        f"*This action cannot be undone!*",
-        reply_markup=reply_markup,
+        _CLEAR_CONFIRM_TEMPLATE.format(n=len(CHANNELS)),
+        reply_markup=_CLEAR_CONFIRM_KEYBOARD,
         parse_mode=ParseMode.MARKDOWN
     )
 
 async def stats_cmd(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Show statistics"""
-    if update.effective_user.id != Config.OWNER_ID:
-        await update.message.reply_text("⚠️ Unauthorized. Only owner can use this bot.")
-        return
-    
     uptime_seconds = time.time() - START_TIME
     uptime_str = time.strftime("%Hh %Mm %Ss", time.gmtime(uptime_seconds))
     
-    stats_text = f"""
-📊 *Bot Statistics*
-
-🤖 *Bot Info:*
-• Username: @{context.bot.username}
-• Owner ID: `{Config.OWNER_ID}`
-• Uptime: {uptime_str}
-
-📢 *Channels:*
-• Total: {len(Config.channels)} channels
-
-🔄 *System:*
-• Status: Running
-• Mode: Polling
-• Storage: Memory
-• Restart: Channels reset on restart
-
-🔗 *Webhook URL:*
-{Config.WEBHOOK_URL or 'Not configured'}
-    """
+    stats_text = _STATS_TEMPLATE.format(
+        username=context.bot.username,
+        owner=OWNER_ID,
+        uptime=uptime_str,
+        n=len(CHANNELS),
+        webhook=WEBHOOK_URL or 'Not configured'
+    )
     
     await update.message.reply_text(stats_text, parse_mode=ParseMode.MARKDOWN)
 
+async def _send_one(chat_id, copy, sem: asyncio.Semaphore):
+    """Copy the broadcast message to a single channel, raising on failure"""
+    # Flood waits are retried by AIORateLimiter; this covers transient network
+    # errors. BadRequest subclasses NetworkError but is permanent.
+    for attempt in range(SEND_ATTEMPTS):
+        try:
+            async with sem:
+                await copy(chat_id=chat_id)
+            return
+        except BadRequest:
+            raise
+        except NetworkError:
+            if attempt == SEND_ATTEMPTS - 1:
+                raise
+            # Back off outside the semaphore so other channels keep sending
+            await asyncio.sleep(SEND_BACKOFF * 4 ** attempt)
+
+def _is_stale_channel_error(error):
+    """Whether a send failure means the channel is gone for good (bot kicked, chat deleted)"""
+    if isinstance(error, Forbidden):
+        return True
+    return isinstance(error, BadRequest) and "chat not found" in error.message.lower()
+
 async def forward_to_channels(message, context: ContextTypes.DEFAULT_TYPE):
     """Forward message to all channels"""
-    if not Config.channels:
-        if message.chat.type != 'private':
-            await message.reply_text("📭 *No channels registered. Use /addchannel first.*", parse_mode=ParseMode.MARKDOWN)
+    if not CHANNELS:
+        await message.reply_text("📭 *No channels registered. Use /addchannel first.*", parse_mode=ParseMode.MARKDOWN)
         return
     
-    total = len(Config.channels)
+    # Sending only needs the ids, which are the dict keys
+    channel_ids = tuple(CHANNELS)
+    total = len(channel_ids)
     successful = 0
     failed = 0
     
-    # Send processing message
-    status_msg = await message.reply_text(f"📤 *Broadcasting to {total} channels...*", parse_mode=ParseMode.MARKDOWN)
+    # Small broadcasts finish quickly; skip the progress message and its edit.
+    # The owner is in the chat already, so bot status replies stay silent
+    status_msg = None
+    if total >= BROADCAST_PROGRESS_MIN:
+        status_msg = await message.reply_text(
+            f"📤 *Broadcasting to {total} channels...*",
+            parse_mode=ParseMode.MARKDOWN,
+            disable_notification=True
+        )
     
-    for channel in Config.channels:
-        try:
-            # Forward based on message type
-            if message.photo:
-                await context.bot.send_photo(
-                    chat_id=channel['id'],
-                    photo=message.photo[-1].file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities,
-                    parse_mode=ParseMode.HTML
-                )
-            elif message.video:
-                await context.bot.send_video(
-                    chat_id=channel['id'],
-                    video=message.video.file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities,
-                    parse_mode=ParseMode.HTML
-                )
-            elif message.document:
-                await context.bot.send_document(
-                    chat_id=channel['id'],
-                    document=message.document.file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities,
-                    parse_mode=ParseMode.HTML
-                )
-            elif message.audio:
-                await context.bot.send_audio(
-                    chat_id=channel['id'],
-                    audio=message.audio.file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities,
-                    parse_mode=ParseMode.HTML
-                )
-            elif message.voice:
-                await context.bot.send_voice(
-                    chat_id=channel['id'],
-                    voice=message.voice.file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities,
-                    parse_mode=ParseMode.HTML
-                )
-            elif message.sticker:
-                await context.bot.send_sticker(
-                    chat_id=channel['id'],
-                    sticker=message.sticker.file_id
-                )
-            elif message.animation:
-                await context.bot.send_animation(
-                    chat_id=channel['id'],
-                    animation=message.animation.file_id,
-                    caption=message.caption,
-                    caption_entities=message.caption_entities,
-                    parse_mode=ParseMode.HTML
-                )
-            else:
-                # Text message
-                await context.bot.send_message(
-                    chat_id=channel['id'],
-                    text=message.text or message.caption or "📢 Broadcast",
-                    entities=message.entities or message.caption_entities,
-                    parse_mode=ParseMode.HTML
-                )
-            
-            successful += 1
-            
-        except Exception as e:
-            logger.error(f"Failed to send to channel {channel['id']}: {e}")
-            failed += 1
-            continue
+    # copyMessage handles every media type and keeps captions/entities; the
+    # source kwargs are bound once and only chat_id varies per channel
+    copy = partial(
+        context.bot.copy_message,
+        from_chat_id=message.chat_id,
+        message_id=message.message_id
+    )
+    sem = asyncio.Semaphore(BROADCAST_CONCURRENCY)
+    results = await asyncio.gather(
+        *(_send_one(chat_id, copy, sem) for chat_id in channel_ids),
+        return_exceptions=True
+    )
     
-    # Update status
-    await status_msg.edit_text(
+    # One summary line per broadcast instead of one line per failed channel
+    errors = Counter()
+    stale = []
+    for chat_id, result in zip(channel_ids, results):
+        if isinstance(result, Exception):
+            logger.debug("Failed to send to channel %s: %s", chat_id, result)
+            errors[type(result).__name__] += 1
+            failed += 1
+            if _is_stale_channel_error(result):
+                stale.append(chat_id)
+        else:
+            successful += 1
+    if errors:
+        logger.error("Broadcast: %d OK, %d failed, by type: %s", successful, failed, dict(errors))
+    
+    # Channels that kicked the bot or no longer exist would fail every future
+    # broadcast; drop them so later fan-outs only hit live channels
+    for chat_id in stale:
+        _forget_chat(chat_id)
+    removed = [chat_id for chat_id in stale if CHANNELS.pop(chat_id, None) is not None]
+    if removed:
+        _channels_changed()
+        logger.info("🧹 Removed %d stale channels: %s", len(removed), removed)
+    
+    summary = (
         f"✅ *Broadcast Complete!*\n\n"
         f"✅ *Successful:* {successful}\n"
         f"❌ *Failed:* {failed}\n"
-        f"📊 *Total:* {total}",
-        parse_mode=ParseMode.MARKDOWN
+        f"📊 *Total:* {total}"
     )
+    if removed:
+        summary += f"\n🧹 *Removed (bot no longer in channel):* {len(removed)}"
+    if status_msg is None:
+        await message.reply_text(
+            summary,
+            quote=True,
+            parse_mode=ParseMode.MARKDOWN,
+            disable_notification=True
+        )
+    else:
+        await status_msg.edit_text(summary, parse_mode=ParseMode.MARKDOWN)
 
 async def handle_message(update: Update, context: ContextTypes.DEFAULT_TYPE):
-    """Handle incoming messages"""
-    user = update.effective_user
-    
-    # Check if owner
-    if user.id != Config.OWNER_ID:
-        await update.message.reply_text("⚠️ *Unauthorized.* Only the owner can use this bot.", parse_mode=ParseMode.MARKDOWN)
-        return
-    
-    # Skip commands
-    if update.message.text and update.message.text.startswith('/'):
-        return
-    
-    # Forward to all channels
-    await forward_to_channels(update.message, context)
+    """Handle incoming messages (owner-only private media/text, see main())"""
+    # Forward to all channels in the background so other updates keep flowing
+    context.application.create_task(forward_to_channels(update.message, context), update=update)
 
 async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     """Handle inline button callbacks"""
+    global CHANNELS
     query = update.callback_query
+    
+    # CallbackQueryHandler takes no filters, so check the owner here; other
+    # users' presses are dropped without even an answerCallbackQuery
+    if query.from_user.id != OWNER_ID:
+        return
+    
     await query.answer()
     
     data = query.data
@@ -462,54 +736,39 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         )
     
     elif data == "list_channels":
-        if not Config.channels:
+        if not CHANNELS:
             await query.edit_message_text("📭 *No channels registered yet.*", parse_mode=ParseMode.MARKDOWN)
             return
         
-        message = "📋 *Registered Channels:*\n\n"
-        for i, channel in enumerate(Config.channels, 1):
-            message += f"{i}. *{channel['title']}*\n"
-            message += f"   • ID: `{channel['id']}`\n\n"
-        
-        message += f"📊 *Total:* {len(Config.channels)} channels"
-        await query.edit_message_text(message, parse_mode=ParseMode.MARKDOWN)
+        # The button's message holds the first chunk; the rest follow as replies
+        first, *rest = _render_channel_list(with_username=False)
+        await query.edit_message_text(first, parse_mode=ParseMode.MARKDOWN, disable_web_page_preview=True)
+        for message in rest:
+            await query.message.reply_text(
+                message,
+                parse_mode=ParseMode.MARKDOWN,
+                disable_web_page_preview=True
+            )
     
     elif data == "remove_channel":
-        if not Config.channels:
+        if not CHANNELS:
             await query.edit_message_text("📭 *No channels to remove.*", parse_mode=ParseMode.MARKDOWN)
             return
         
-        keyboard = []
-        for channel in Config.channels:
-            button_text = f"❌ {channel['title'][:30]}"
-            callback_data = f"remove_{channel['id']}"
-            keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
-        
-        reply_markup = InlineKeyboardMarkup(keyboard)
         await query.edit_message_text(
             "🗑️ *Select a channel to remove:*",
-            reply_markup=reply_markup,
+            reply_markup=_remove_keyboard(),
             parse_mode=ParseMode.MARKDOWN
         )
     
     elif data == "clear_all":
-        if not Config.channels:
+        if not CHANNELS:
             await query.edit_message_text("📭 *No channels to clear.*", parse_mode=ParseMode.MARKDOWN)
             return
         
-        keyboard = [
-            [
-                InlineKeyboardButton("✅ Yes, clear all", callback_data="clear_yes"),
-                InlineKeyboardButton("❌ No, cancel", callback_data="clear_no")
-            ]
-        ]
-        reply_markup = InlineKeyboardMarkup(keyboard)
-        
         await query.edit_message_text(
-            f"⚠️ *Confirm Clear All Channels*\n\n"
-            f"This will remove *{len(Config.channels)}* channels.\n"
-            f"*This action cannot be undone!*",
-            reply_markup=reply_markup,
+            _CLEAR_CONFIRM_TEMPLATE.format(n=len(CHANNELS)),
+            reply_markup=_CLEAR_CONFIRM_KEYBOARD,
             parse_mode=ParseMode.MARKDOWN
         )
     
@@ -517,43 +776,36 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
         uptime_seconds = time.time() - START_TIME
         uptime_str = time.strftime("%Hh %Mm %Ss", time.gmtime(uptime_seconds))
         
-        stats_text = f"""
-📊 *Bot Statistics*
-
-🤖 *Bot Info:*
-• Username: @{context.bot.username}
-• Owner ID: `{Config.OWNER_ID}`
-• Uptime: {uptime_str}
-
-📢 *Channels:*
-• Total: {len(Config.channels)} channels
-
-🔄 *System:*
-• Status: Active
-• Mode: Polling
-• Storage: Memory
-        """
+        stats_text = _STATS_BRIEF_TEMPLATE.format(
+            username=context.bot.username,
+            owner=OWNER_ID,
+            uptime=uptime_str,
+            n=len(CHANNELS)
+        )
         
         await query.edit_message_text(stats_text, parse_mode=ParseMode.MARKDOWN)
     
     elif data.startswith("remove_"):
         channel_id = int(data.replace("remove_", ""))
         
-        for i, channel in enumerate(Config.channels):
-            if channel['id'] == channel_id:
-                removed = Config.channels.pop(i)
-                await query.edit_message_text(
-                    f"✅ *Channel Removed:*\n`{removed['title']}`\n"
-                    f"📊 *Remaining:* {len(Config.channels)} channels",
-                    parse_mode=ParseMode.MARKDOWN
-                )
-                return
+        removed = CHANNELS.pop(channel_id, None)
+        if removed:
+            _channels_changed()
+            await query.edit_message_text(
+                f"✅ *Channel Removed:*\n`{removed.title}`\n"
+                f"📊 *Remaining:* {len(CHANNELS)} channels",
+                parse_mode=ParseMode.MARKDOWN
+            )
+            return
         
         await query.edit_message_text("❌ *Channel not found.*", parse_mode=ParseMode.MARKDOWN)
     
     elif data == "clear_yes":
-        channel_count = len(Config.channels)
-        Config.channels.clear()
+        channel_count = len(CHANNELS)
+        # Rebind rather than clear() so anything still holding the old dict
+        # never sees it mutate mid-iteration
+        CHANNELS = {}
+        _channels_changed()
         await query.edit_message_text(
             f"✅ *All {channel_count} channels cleared.*\n"
             f"Use /addchannel to add new channels.",
@@ -563,148 +815,172 @@ async def button_handler(update: Update, context: ContextTypes.DEFAULT_TYPE):
     elif data == "clear_no":
         await query.edit_message_text(
             "✅ *Operation cancelled.*\n"
-            f"Channels preserved: {len(Config.channels)}",
+            f"Channels preserved: {len(CHANNELS)}",
             parse_mode=ParseMode.MARKDOWN
         )
 
 # ─────────────────────────────
 #  KEEP ALIVE SYSTEM (PREVENTS SLEEP)
 # ─────────────────────────────
-def keep_alive():
+async def keep_alive():
     """Ping Render service to prevent sleep"""
-    if not Config.WEBHOOK_URL:
-        logger.info("⚠️ Keep-alive disabled: WEBHOOK_URL not configured")
-        return
-    
-    urls_to_ping = [
-        Config.WEBHOOK_URL,
-        f"{Config.WEBHOOK_URL}/",
-        f"{Config.WEBHOOK_URL}/ping",
-        f"{Config.WEBHOOK_URL}/stats"
-    ]
+    # Any request keeps the service awake; /ping is the cheapest endpoint
+    ping_url = f"{WEBHOOK_URL}/ping"
     
     logger.info("🔔 Starting keep-alive system...")
     
-    while True:
-        try:
-            for url in urls_to_ping:
-                try:
-                    response = requests.get(url, timeout=10)
-                    logger.info(f"✅ Pinged {url} - Status: {response.status_code}")
-                except Exception as e:
-                    logger.warning(f"⚠️ Ping failed for {url}: {e}")
+    # One pooled client for the lifetime of the loop
+    async with httpx.AsyncClient(timeout=10) as client:
+        while True:
+            try:
+                response = await client.get(ping_url)
+                logger.debug("✅ Pinged %s - Status: %s", ping_url, response.status_code)
+            except Exception as e:
+                logger.warning("⚠️ Ping failed for %s: %s", ping_url, e)
             
             # Wait before next ping cycle
-            time.sleep(120)  # Ping every 2 minutes
-        
-        except Exception as e:
-            logger.error(f"❌ Keep-alive error: {e}")
-            time.sleep(60)
+            await asyncio.sleep(120)  # Ping every 2 minutes
 
 # ─────────────────────────────
 #  BOT HEALTH MONITOR
 # ─────────────────────────────
-def bot_health_monitor(application):
+async def bot_health_monitor(bot):
     """Monitor bot health"""
     logger.info("❤️ Starting health monitor...")
     
     while True:
         try:
             # Check bot status
-            bot_info = application.bot.get_me()
-            logger.info(f"🤖 Bot healthy: @{bot_info.username}")
+            bot_info = await bot.get_me()
+            logger.info("🤖 Bot healthy: @%s", bot_info.username)
             
             # Log channel count
-            logger.info(f"📊 Channels: {len(Config.channels)}")
+            logger.info("📊 Channels: %d", len(CHANNELS))
             
         except Exception as e:
-            logger.error(f"❌ Health check failed: {e}")
+            logger.error("❌ Health check failed: %s", e)
         
-        time.sleep(300)  # Check every 5 minutes
+        await asyncio.sleep(300)  # Check every 5 minutes
 
 # ─────────────────────────────
-#  RUN FASTAPI SERVER
+#  RUN BOT + FASTAPI SERVER
 # ─────────────────────────────
-def run_fastapi():
-    """Run FastAPI server"""
-    logger.info(f"🚀 Starting FastAPI on port {Config.PORT}")
-    import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=Config.PORT, log_level="info")
+async def run_services(application: Application):
+    """Run the bot and the FastAPI server together on one event loop"""
+    # httptools parser; no access log, health pings are just noise
+    server = uvicorn.Server(uvicorn.Config(
+        app,
+        host="0.0.0.0",
+        port=PORT,
+        log_level="warning",
+        http="httptools",
+        access_log=False
+    ))
+    
+    async with application:
+        await post_init(application)
+        try:
+            await application.updater.start_polling(
+                timeout=POLL_TIMEOUT,
+                drop_pending_updates=True,
+                allowed_updates=ALLOWED_UPDATES
+            )
+            await application.start()
+            logger.info("🚀 Starting FastAPI on port %s", PORT)
+            logger.info("🤖 Bot is now running...")
+            
+            # Returns once uvicorn catches SIGINT/SIGTERM; it then re-raises
+            # the signal, so cleanup below runs on the way out
+            await server.serve()
+        finally:
+            if application.updater.running:
+                await application.updater.stop()
+            if application.running:
+                await application.stop()
+            await post_shutdown(application)
 
 # ─────────────────────────────
 #  MAIN ENTRY POINT
 # ─────────────────────────────
+def build_application():
+    """Create the bot application and register its handlers"""
+    # AIORateLimiter keeps sends under Telegram's 30 msg/s global and
+    # 20 msg/min per-channel limits and retries flood waits.
+    # Broadcast fan-out shares a large HTTP/2 pool so concurrent sends multiplex
+    # over a few connections instead of queueing for PTB's default pool of 1.
+    request = HTTPXRequest(
+        connection_pool_size=BROADCAST_CONCURRENCY + 8,
+        http_version="2",
+        read_timeout=20,
+        write_timeout=20,
+    )
+    application = (
+        Application.builder()
+        .token(BOT_TOKEN)
+        .request(request)
+        .rate_limiter(AIORateLimiter(max_retries=3))
+        .concurrent_updates(True)
+        .build()
+    )
+    
+    # Add command handlers
+    application.add_handler(CommandHandler("start", start, filters=OWNER_FILTER))
+    application.add_handler(CommandHandler("help", help_cmd, filters=OWNER_FILTER))
+    application.add_handler(CommandHandler("addchannel", addchannel_cmd, filters=OWNER_FILTER))
+    application.add_handler(CommandHandler("listchannels", listchannels_cmd, filters=OWNER_FILTER))
+    application.add_handler(CommandHandler("removechannel", removechannel_cmd, filters=OWNER_FILTER))
+    application.add_handler(CommandHandler("clearchannels", clearchannels_cmd, filters=OWNER_FILTER))
+    application.add_handler(CommandHandler("stats", stats_cmd, filters=OWNER_FILTER))
+    
+    # Add button handler
+    application.add_handler(CallbackQueryHandler(button_handler))
+    
+    # Add message handler
+    application.add_handler(MessageHandler(
+        OWNER_FILTER & filters.ChatType.PRIVATE & (
+            filters.TEXT | filters.PHOTO | filters.VIDEO | filters.Document.ALL |
+            filters.AUDIO | filters.VOICE | filters.VIDEO_NOTE |
+            filters.Sticker.ALL | filters.ANIMATION
+        ) & ~filters.COMMAND,
+        handle_message
+    ))
+    
+    return application
+
 def main():
     """Main function to start everything"""
     # Validate environment variables
-    if not Config.BOT_TOKEN:
+    if not BOT_TOKEN:
         logger.error("❌ Missing BOT_TOKEN environment variable")
         raise ValueError("BOT_TOKEN is required")
     
-    if not Config.OWNER_ID:
-        logger.error("❌ Missing OWNER_ID environment variable")
-        raise ValueError("OWNER_ID is required")
+    # Use libuv's event loop for the bot and FastAPI when available (Linux/macOS)
+    if uvloop is not None:
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
     
     logger.info("=" * 50)
     logger.info("🤖 Starting Channel Manager Bot")
-    logger.info(f"👤 Owner ID: {Config.OWNER_ID}")
-    logger.info(f"🌐 Webhook URL: {Config.WEBHOOK_URL or 'Not configured'}")
-    logger.info(f"🚪 Port: {Config.PORT}")
+    logger.info("👤 Owner ID: %s", OWNER_ID)
+    logger.info("🌐 Webhook URL: %s", WEBHOOK_URL or 'Not configured')
+    logger.info("🚪 Port: %s", PORT)
     logger.info("=" * 50)
     
-    # Start FastAPI server in background thread
-    fastapi_thread = threading.Thread(target=run_fastapi, daemon=True)
-    fastapi_thread.start()
-    logger.info("✅ FastAPI server started")
-    
-    # Start keep-alive system (only if webhook URL is configured)
-    if Config.WEBHOOK_URL:
-        keep_alive_thread = threading.Thread(target=keep_alive, daemon=True)
-        keep_alive_thread.start()
-        logger.info("✅ Keep-alive system started")
-    else:
-        logger.info("ℹ️ Keep-alive system disabled (no WEBHOOK_URL)")
-    
-    # Create and configure bot
-    application = Application.builder().token(Config.BOT_TOKEN).build()
-    
-    # Add command handlers
-    application.add_handler(CommandHandler("start", start))
-    application.add_handler(CommandHandler("help", help_cmd))
-    application.add_handler(CommandHandler("addchannel", addchannel_cmd))
-    application.add_handler(CommandHandler("listchannels", listchannels_cmd))
-    application.add_handler(CommandHandler("removechannel", removechannel_cmd))
-    application.add_handler(CommandHandler("clearchannels", clearchannels_cmd))
-    application.add_handler(CommandHandler("stats", stats_cmd))
-    
-    # Add button handler
-    application.add_handler(CallbackQueryHandler(button_handler))
-    
-    # Add message handler
-    application.add_handler(MessageHandler(filters.ALL & ~filters.COMMAND, handle_message))
-    
-    # Start health monitor
-    health_thread = threading.Thread(target=bot_health_monitor, args=(application,), daemon=True)
-    health_thread.start()
-    logger.info("✅ Health monitor started")
-    
-    logger.info("✅ All systems started successfully!")
-    logger.info("🤖 Bot is now running...")
+    # Treat SIGTERM (Render shutdown) like Ctrl+C so channels get flushed
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
     
-    try:
-        # Run bot with polling
-        application.run_polling(
-            drop_pending_updates=True,
-            allowed_updates=Update.ALL_TYPES,
-            close_loop=False
-        )
-    except KeyboardInterrupt:
-        logger.info("👋 Bot stopped by user")
-    except Exception as e:
-        logger.error(f"❌ Bot crashed: {e}")
-        logger.info("🔄 Attempting to restart in 30 seconds...")
-        time.sleep(30)
-        main()  # Auto-restart
+    # Supervise: each attempt gets a fresh event loop and application, and
+    # run_services tears everything down before we retry
+    while True:
+        try:
+            asyncio.run(run_services(build_application()))
+            break
+        except KeyboardInterrupt:
+            logger.info("👋 Bot stopped by user")
+            break
+        except Exception as e:
+            logger.error("❌ Bot crashed: %s", e)
+            logger.info("🔄 Attempting to restart in 30 seconds...")
+            time.sleep(30)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,47 @@
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bot
+
+
+class SharedBackoffFallbackTest(unittest.IsolatedAsyncioTestCase):
+    """Sends must succeed whatever state REDIS_URL is in."""
+
+    def setUp(self):
+        patcher = mock.patch.object(bot, "_redis", None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.channel = {"id": -100123, "title": "Test"}
+
+    async def _send_with(self, redis_url):
+        send = mock.AsyncMock()
+        with mock.patch.object(bot, "REDIS_URL", redis_url):
+            result = await bot._send_to(self.channel, send, {"text": "hi"})
+        send.assert_awaited_once_with(chat_id=self.channel["id"], text="hi")
+        return result
+
+    async def test_unset(self):
+        self.assertEqual(await self._send_with(None), (self.channel, None))
+
+    async def test_bad_scheme(self):
+        if bot.aioredis is None:
+            self.skipTest("redis not installed")
+        with self.assertLogs(bot.logger, "WARNING"):
+            self.assertEqual(await self._send_with("localhost:6379"), (self.channel, None))
+        # The bad URL is only tried once per process
+        self.assertIs(bot._redis, False)
+        self.assertIsNone(bot._get_redis())
+
+    async def test_unreachable_host(self):
+        if bot.aioredis is None:
+            self.skipTest("redis not installed")
+        with self.assertLogs(bot.logger, "WARNING"):
+            self.assertEqual(await self._send_with("redis://127.0.0.1:1/0"), (self.channel, None))
+
+
+if __name__ == "__main__":
+    unittest.main()